@@ -2,22 +2,60 @@
 import os
 import json
 import re
+import asyncio
+import hashlib
+import html
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from dateutil import tz, parser as dtparser
 import requests
+from requests.adapters import HTTPAdapter
+import aiohttp
 import feedparser
+from lxml import etree
 import yfinance as yf
 
+try:
+    import orjson
+except ImportError:  # Optional, stdlib json is used instead
+    orjson = None
+try:
+    import hyperscan
+except ImportError:  # Optional, falls back to Aho-Corasick
+    hyperscan = None
+try:
+    import ahocorasick
+except ImportError:  # Fall back to a regex alternation
+    ahocorasick = None
+
 # Config from env
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
 POLL_FEEDS = os.getenv("RSS_FEEDS", "")
-SEEN_DB = os.getenv("SEEN_DB", "seen.json")
+SEEN_DB = os.getenv("SEEN_DB", "seen.db")
+SEEN_JSON = os.getenv("SEEN_JSON", "seen.json")  # Legacy store, imported once into SEEN_DB
+SEEN_TTL_DAYS = int(os.getenv("SEEN_TTL_DAYS", "30"))  # Forget sent IDs after this many days
+TRANSLATE_CACHE_DB = os.getenv("TRANSLATE_CACHE_DB", "translate_cache.db")
 MAX_PER_RUN = int(os.getenv("MAX_PER_RUN", "8"))
 SUMMARY_WORDS = int(os.getenv("SUMMARY_WORDS", "18"))
 TRANSLATE_TARGET = os.getenv("TRANSLATE_TARGET", "hi")
 TICKERS = os.getenv("TICKERS", "RELIANCE.NS,SBIN.NS,AAPL,TSLA").split(",")  # Stock tickers from env, default to some stocks
+RSS_CONCURRENCY = int(os.getenv("RSS_CONCURRENCY", "8"))  # Max feeds fetched at the same time
+# Max sendMessage calls per second. Telegram allows ~30/s per bot but only ~1/s
+# per chat (~20/min in groups), and every message here goes to one chat.
+TELEGRAM_RATE = float(os.getenv("TELEGRAM_RATE", "1"))
+if TELEGRAM_RATE <= 0:
+    print("TELEGRAM_RATE must be greater than 0.")
+    raise SystemExit(1)
+USER_AGENT = "Mozilla/5.0 (compatible; stock-notifier/1.0)"
+TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+TRANSLATE_MAX_CHARS = 4500  # Google rejects requests above ~5000 chars
 
 # Keywords for filtering
 DEFAULT_KEYWORDS = [
@@ -34,6 +72,44 @@ else:
 escaped = [re.escape(k) for k in KEYWORDS if k]
 pattern = re.compile(r"(" + r"|".join(escaped) + r")", flags=re.IGNORECASE) if escaped else None
 
+# Aho-Corasick scans the text once no matter how many keywords there are
+automaton = None
+if ahocorasick and escaped:
+    automaton = ahocorasick.Automaton()
+    for k in KEYWORDS:
+        if k:
+            automaton.add_word(k.lower(), k)
+    automaton.make_automaton()
+
+# Hyperscan compiles all keywords into one SIMD-accelerated DFA, when available
+hs_db = None
+if hyperscan and escaped:
+    try:
+        hs_db = hyperscan.Database()
+        hs_db.compile(
+            expressions=[e.encode() for e in escaped],
+            ids=list(range(len(escaped))),
+            elements=len(escaped),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8] * len(escaped),
+        )
+    except Exception as e:
+        print("Hyperscan compile error, using fallback matcher:", e)
+        hs_db = None
+
+def _hs_search(text):
+    hits = []
+    def on_match(id_, start, end, flags, context):
+        hits.append(id_)
+        return True  # Terminate the scan on the first keyword
+    try:
+        hs_db.scan(text.encode(), match_event_handler=on_match)
+    except hyperscan.error:
+        pass  # Older bindings report the early termination as an error
+    return bool(hits)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_TBL = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
 # Updated top news feeds (reliable for stock market and corporate news)
 DEFAULT_FEEDS = [
     "https://feeds.reuters.com/reuters/marketsNews",  # Global markets
@@ -51,100 +127,375 @@ if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
     print("Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in repo secrets / env.")
     raise SystemExit(1)
 
-SEEN_DB_PATH = Path(SEEN_DB)
-if not SEEN_DB_PATH.exists():
-    SEEN_DB_PATH.write_text(json.dumps({"seen": []}, indent=2))
+# One keep-alive session for Google Translate and Telegram, so each host pays a
+# single TLS handshake per run instead of one per request
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+SESSION.headers["User-Agent"] = USER_AGENT
+
+def id_hash(item_id):
+    # 64-bit digest of an item ID, as a signed int so SQLite stores it in the rowid
+    return int.from_bytes(hashlib.blake2b(item_id.encode(), digest_size=8).digest(), "big", signed=True)
+
+class SeenDB:
+    """Set-like store of already sent item IDs, backed by SQLite.
+
+    IDs are stored as 64-bit hashes rather than full URLs, and entries older
+    than ttl_days are dropped on open so the store stays bounded.
+    """
+
+    def __init__(self, path, legacy_json=None, ttl_days=SEEN_TTL_DAYS):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_hash(h INTEGER PRIMARY KEY, first_seen INTEGER)")
+        self.conn.commit()
+        if legacy_json:
+            self._migrate(Path(legacy_json))
+        if ttl_days > 0:
+            self.prune(ttl_days)
+
+    def _insert_many(self, ids):
+        self._insert_hashes([id_hash(i) for i in ids if i])
+
+    def _insert_hashes(self, hashes):
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen_hash(h, first_seen) VALUES (?, ?)", [(h, now) for h in hashes])
+
+    def _migrate(self, json_path):
+        # One-shot import of the old seen.json, only into an empty table
+        if not json_path.exists() or self.conn.execute("SELECT 1 FROM seen_hash LIMIT 1").fetchone():
+            return
+        try:
+            data = orjson.loads(json_path.read_bytes()) if orjson else json.loads(json_path.read_text())
+            ids = data.get("seen", [])
+        except Exception as e:
+            print("Seen migration error:", json_path, e)
+            return
+        self._insert_many(ids)
+        print(f"Migrated {len(ids)} seen IDs from {json_path}")
+
+    def prune(self, ttl_days):
+        with self.conn:
+            self.conn.execute("DELETE FROM seen_hash WHERE first_seen < ?", (int(time.time()) - ttl_days * 86400,))
+
+    def __contains__(self, item_id):
+        return self.conn.execute("SELECT 1 FROM seen_hash WHERE h=?", (id_hash(item_id),)).fetchone() is not None
+
+    def add(self, item_id):
+        self._insert_many([item_id])
+
+    def has_hash(self, h):
+        return self.conn.execute("SELECT 1 FROM seen_hash WHERE h=?", (h,)).fetchone() is not None
+
+    def add_hash(self, h):
+        # h is a precomputed signed 64-bit key, e.g. from story_keys()
+        self._insert_hashes([h])
+
+    def close(self):
+        self.conn.close()
 
-def load_seen():
+# Translations persist across runs; headlines repeat a lot between feeds and days
+CACHE_DB = sqlite3.connect(TRANSLATE_CACHE_DB)
+CACHE_DB.execute("CREATE TABLE IF NOT EXISTS t(k TEXT PRIMARY KEY, v TEXT)")
+CACHE_DB.commit()
+
+def _cache_key(text, target):
+    return hashlib.blake2b(f"{target}|{text}".encode(), digest_size=8).hexdigest()
+
+def cache_get(text, target):
     try:
-        return set(json.loads(SEEN_DB_PATH.read_text()).get("seen", []))
+        row = CACHE_DB.execute("SELECT v FROM t WHERE k=?", (_cache_key(text, target),)).fetchone()
     except Exception:
-        return set()
+        return None
+    return row[0] if row else None
+
+def cache_put(pairs, target):
+    try:
+        with CACHE_DB:
+            CACHE_DB.executemany("INSERT OR REPLACE INTO t(k, v) VALUES (?, ?)",
+                                 [(_cache_key(text, target), v) for text, v in pairs])
+    except Exception as e:
+        print("Translate cache error:", e)
+
+# Unicode block per target language, used to skip text that is already translated
+SCRIPT_RANGES = {"hi": (0x0900, 0x097F), "mr": (0x0900, 0x097F), "ne": (0x0900, 0x097F)}
 
-def save_seen(seen_set):
-    SEEN_DB_PATH.write_text(json.dumps({"seen": list(seen_set)}, indent=2))
+def already_in_target(text, target):
+    rng = SCRIPT_RANGES.get(target)
+    if not rng or not text:
+        return False
+    lo, hi = rng
+    return sum(1 for c in text if lo <= ord(c) <= hi) / len(text) > 0.6
+
+def _google_translate(text, target):
+    params = {"client": "gtx", "sl": "auto", "tl": target, "dt": "t"}
+    resp = SESSION.post(TRANSLATE_URL, params=params, data={"q": text}, timeout=8)
+    resp.raise_for_status()
+    data = resp.json()
+    return "".join([chunk[0] for chunk in data[0] if chunk and chunk[0]])
+
+def _translate_line(text):
+    # Both translate paths send and cache the same whitespace-collapsed form
+    return " ".join(text.split()) if text else ""
 
 def safe_translate(text, target=TRANSLATE_TARGET):
-    if not text:
+    line = _translate_line(text)
+    if not line:
         return ""
+    if already_in_target(line, target):
+        return line
+    cached = cache_get(line, target)
+    if cached is not None:
+        return cached
     try:
-        params = {"client": "gtx", "sl": "auto", "tl": target, "dt": "t", "q": text}
-        resp = requests.get("https://translate.googleapis.com/translate_a/single", params=params, timeout=8)
-        resp.raise_for_status()
-        data = resp.json()
-        translated = "".join([chunk[0] for chunk in data[0] if chunk and chunk[0]])
-        return translated
+        translated = _google_translate(line, target).strip()
     except Exception:
-        return text
+        return line
+    cache_put([(line, translated)], target)
+    return translated
+
+def translate_batch(texts, target=TRANSLATE_TARGET):
+    # Translate many strings with as few requests as possible: strings are sent
+    # newline-joined (Google keeps line breaks) and split back afterwards.
+    results = list(texts)
+    pending = {}  # line -> indices in texts, so repeated strings are sent once
+    for i, text in enumerate(texts):
+        line = _translate_line(text)
+        if not line:
+            results[i] = ""
+            continue
+        if already_in_target(line, target):
+            results[i] = line
+            continue
+        cached = cache_get(line, target)
+        if cached is not None:
+            results[i] = cached
+            continue
+        pending.setdefault(line, []).append(i)
+    chunks, chunk, size = [], [], 0
+    for line in pending:
+        if chunk and size + len(line) + 1 > TRANSLATE_MAX_CHARS:
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line) + 1
+    if chunk:
+        chunks.append(chunk)
+    for chunk in chunks:
+        try:
+            parts = _google_translate("\n".join(chunk), target).split("\n")
+        except Exception as e:
+            print("Translate batch error:", e)
+            parts = []
+        if len(parts) != len(chunk):
+            # Line count got mangled; translate this chunk one string at a time
+            parts = [safe_translate(line, target) for line in chunk]
+        else:
+            parts = [part.strip() for part in parts]
+            cache_put(list(zip(chunk, parts)), target)
+        for line, part in zip(chunk, parts):
+            for i in pending[line]:
+                results[i] = part
+    return results
+
+class RateLimiter:
+    """Token bucket for Telegram sends; pause() holds every send until Telegram's retry_after passes."""
 
-def send_telegram_message(text):
+    def __init__(self, rate, per=1.0):
+        self.rate = rate
+        self.per = per
+        self.capacity = max(1.0, rate)  # Rates below 1/s still need room for one whole token
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                time.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / self.per)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) * self.per / self.rate)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+TELEGRAM_LIMITER = RateLimiter(TELEGRAM_RATE)
+
+def send_telegram_message(text, attempts=3):
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {"chat_id": TELEGRAM_CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": False}
+    for _ in range(attempts):
+        TELEGRAM_LIMITER.acquire()
+        try:
+            r = SESSION.post(url, data=payload, timeout=10)
+            if r.status_code == 429:
+                # Telegram tells us how long to back off
+                retry_after = r.json().get("parameters", {}).get("retry_after", 1)
+                print(f"Telegram rate limit hit, retrying in {retry_after}s")
+                TELEGRAM_LIMITER.pause(retry_after)
+                continue
+            r.raise_for_status()
+            return True
+        except Exception as e:
+            print("Telegram send error:", e)
+            return False
+    return False
+
+def _parse_rss2(body):
+    # Stream plain RSS 2.0 with lxml, keeping only the fields we use.
+    # Returns None for anything else (Atom, RDF) so feedparser can handle it.
+    items = []
+    src = ""
+    root = None
+    context = etree.iterparse(BytesIO(body), events=("start", "end"), resolve_entities=False, no_network=True)
+    for event, elem in context:
+        if event == "start":
+            if root is None:
+                root = elem
+                if elem.tag != "rss":
+                    return None
+            continue
+        if elem.tag == "item":
+            # One walk over the children instead of a findtext() scan per field
+            fields = {"guid": None, "title": None, "link": None, "description": None, "pubDate": None}
+            for child in elem:
+                tag = child.tag
+                if tag in fields and fields[tag] is None:
+                    fields[tag] = (child.text or "").strip()
+            title = html.unescape(fields["title"] or "")  # Entities inside CDATA, like feedparser
+            link = fields["link"] or ""
+            items.append({"id": fields["guid"] or link or title, "title": title, "summary": fields["description"] or "",
+                          "link": link, "source": "", "published": fields["pubDate"] or ""})
+            # Free parsed items as we go
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        elif elem.tag == "title" and elem.getparent() is not None and elem.getparent().tag == "channel":
+            src = (elem.text or "").strip()
+    for it in items:
+        it["source"] = src
+    return items
+
+def fetch_from_rss(feed_url, body):
     try:
-        r = requests.post(url, data=payload, timeout=10)
-        r.raise_for_status()
-        return True
+        items = _parse_rss2(body)
+        if items is not None:
+            return items
     except Exception as e:
-        print("Telegram send error:", e)
-        return False
-
-def fetch_from_rss(feed_url):
+        print("RSS fast parse failed, using feedparser:", feed_url, e)
     try:
-        feed = feedparser.parse(feed_url)
+        feed = feedparser.parse(body)
     except Exception as e:
         print("RSS parse error:", feed_url, e)
         return []
     items = []
+    append = items.append
+    src = feed.feed.get("title", "") or ""  # Same for every entry, look it up once
     for entry in feed.entries:
-        uid = entry.get("id") or entry.get("guid") or entry.get("link") or entry.get("title")
-        title = entry.get("title", "")
-        summary = entry.get("summary") or entry.get("description") or ""
-        link = entry.get("link", "")
-        src = feed.feed.get("title", "") or ""
-        items.append({"id": uid, "title": title, "summary": summary, "link": link, "source": src, "published": entry.get("published", "")})
+        get = entry.get
+        uid = get("id") or get("guid") or get("link") or get("title")
+        title = get("title", "")
+        summary = get("summary") or get("description") or ""
+        link = get("link", "")
+        append({"id": uid, "title": title, "summary": summary, "link": link, "source": src, "published": get("published", "")})
     return items
 
-def fetch_from_yfinance(tickers):
-    items = []
-    for ticker in tickers:
+async def fetch_one(session, sem, feed_url):
+    # Only the download is async; parsing stays synchronous in fetch_from_rss
+    async with sem:
         try:
-            stock = yf.Ticker(ticker)
-            articles = stock.news  # Fetch news from yfinance
-            for article in articles[:3]:  # Limit to 3 news per stock
-                uid = article.get("uuid") or article.get("link") or article.get("title")
-                title = article.get("title", "")
-                summary = article.get("publisher", "")  # yfinance news has no summary, use publisher as context
-                link = article.get("link", "")
-                src = article.get("publisher", "Yahoo Finance")
-                published = article.get("providerPublishTime", "")
-                if published:
-                    published = datetime.fromtimestamp(published, tz=tz.gettz("Asia/Kolkata")).isoformat()
-                items.append({"id": uid, "title": title, "summary": summary, "link": link, "source": src, "published": published})
+            async with session.get(feed_url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                resp.raise_for_status()
+                body = await resp.read()
         except Exception as e:
-            print(f"yfinance error for {ticker}:", e)
+            print("RSS fetch error:", feed_url, e)
+            return []
+    return fetch_from_rss(feed_url, body)
+
+async def _fetch_all_rss(feed_urls):
+    sem = asyncio.Semaphore(RSS_CONCURRENCY)
+    async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session:
+        return await asyncio.gather(*[fetch_one(session, sem, u) for u in feed_urls])
+
+def fetch_all_rss(feed_urls):
+    # Fetch all feeds concurrently so the RSS stage takes as long as the slowest feed
+    items = []
+    for feed_items in asyncio.run(_fetch_all_rss(feed_urls)):
+        items.extend(feed_items)
+    return items
+
+def _fetch_ticker_news(ticker):
+    items = []
+    try:
+        stock = yf.Ticker(ticker)
+        articles = stock.news  # Fetch news from yfinance
+        for article in articles[:3]:  # Limit to 3 news per stock
+            uid = article.get("uuid") or article.get("link") or article.get("title")
+            title = article.get("title", "")
+            summary = article.get("publisher", "")  # yfinance news has no summary, use publisher as context
+            link = article.get("link", "")
+            src = article.get("publisher", "Yahoo Finance")
+            item = {"id": uid, "title": title, "summary": summary, "link": link, "source": src, "published": ""}
+            if article.get("providerPublishTime"):
+                item["published_ts"] = int(article["providerPublishTime"])  # Already epoch seconds, no parsing needed
+            items.append(item)
+    except Exception as e:
+        print(f"yfinance error for {ticker}:", e)
+    return items
+
+def fetch_from_yfinance(tickers):
+    tickers = [t.strip() for t in tickers if t.strip()]
+    if not tickers:
+        return []
+    # Each .news lookup is a blocking HTTPS call, so run them side by side
+    items = []
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as ex:
+        for ticker_items in ex.map(_fetch_ticker_news, tickers):
+            items.extend(ticker_items)
     return items
 
 def parse_time_safe(s):
+    # RSS pubDate is RFC 822, which the stdlib parses far faster than dateutil
     try:
-        return dtparser.parse(s)
+        dt = parsedate_to_datetime(s)
     except Exception:
-        return datetime.now(tz=tz.gettz("Asia/Kolkata"))
+        try:
+            dt = dtparser.parse(s)
+        except Exception:
+            return datetime.now(tz=tz.gettz("Asia/Kolkata"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz.gettz("Asia/Kolkata"))
+    return dt
+
+def published_ts(s):
+    return int(parse_time_safe(s).timestamp())
 
 def short_summary(text, words=SUMMARY_WORDS):
     if not text:
         return ""
-    t = re.sub(r"<[^>]+>", "", text)
-    toks = re.split(r"\s+", t)
+    # maxsplit stops splitting once we have enough words; the rest stays in toks[-1]
+    toks = _TAG_RE.sub("", text).split(None, words)
     short = " ".join(toks[:words])
     if len(toks) > words:
         short += "…"
     return short
 
-def build_msg(item):
+def build_msg(item, translated=None):
+    translated = translated or {}
     title_en = item.get("title", "")
     summ_en = short_summary(item.get("summary", ""))
-    title_hi = safe_translate(title_en)
-    summ_hi = safe_translate(summ_en) if summ_en else ""
+    title_hi = translated[title_en] if title_en in translated else safe_translate(title_en)
+    if summ_en in translated:
+        summ_hi = translated[summ_en]
+    else:
+        summ_hi = safe_translate(summ_en) if summ_en else ""
     src = item.get("source", "")
     link = item.get("link", "")
     msg = f"<b>{escape_html(title_hi)}</b>"
@@ -159,27 +510,85 @@ def build_msg(item):
 def escape_html(t):
     if not t:
         return ""
-    return (t.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;"))
+    return t.translate(_HTML_TBL)
+
+def _contains_keyword(text):
+    if hs_db:
+        return _hs_search(text)
+    if automaton:
+        return next(automaton.iter(text.lower()), None) is not None
+    return bool(pattern.search(text))
 
 def matches_keywords(item):
     if not pattern:
         return True
-    text = " ".join([str(item.get("title", "")), str(item.get("summary", "")), str(item.get("source", ""))])
-    return bool(pattern.search(text))
+    # Check fields one by one: the title usually matches, so the summary is often never scanned
+    for field in ("title", "summary", "source"):
+        text = item.get(field)
+        if text and _contains_keyword(str(text)):
+            return True
+    return False
+
+def normalize_link(link):
+    # Drop tracking params and fragments so the same article compares equal across feeds
+    try:
+        parts = urlsplit(link.strip())
+    except ValueError:
+        return link.strip()
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not k.lower().startswith("utm_")])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+def normalize_title(title):
+    return " ".join(re.sub(r"\W+", " ", title.casefold()).split())
+
+def story_keys(item):
+    # Signed 64-bit keys for the normalized link and title; shared by in-run
+    # dedup and SeenDB, so a story sent from one feed is skipped from the others later
+    keys = []
+    link = normalize_link(item.get("link") or "")
+    if link:
+        keys.append(id_hash("l:" + link))
+    title = normalize_title(item.get("title") or "")
+    if title:
+        keys.append(id_hash("t:" + title))
+    return keys
+
+def dedup_items(items):
+    # items must be oldest first; the earliest copy of a story is kept and the
+    # IDs and keys of later copies are remembered so they get marked seen with it
+    kept = []
+    by_key = {}
+    for it in items:
+        keys = it.setdefault("story_keys", story_keys(it))
+        first = next((by_key[k] for k in keys if k in by_key), None)
+        if first is None:
+            first = it
+            kept.append(it)
+        else:
+            if it["id"] != first["id"]:
+                first.setdefault("dupe_ids", []).append(it["id"])
+            first.setdefault("dupe_keys", []).extend(keys)
+        for k in keys:
+            by_key.setdefault(k, first)
+    return kept
 
 def main():
-    seen = load_seen()
+    seen = SeenDB(SEEN_DB, SEEN_JSON)
     new_items = []
     
     # Fetch from RSS feeds
-    for feed in RSS_FEEDS:
-        for it in fetch_from_rss(feed):
-            if not it.get("id"):
-                it["id"] = (it.get("link") or it.get("title"))[:300]
-            if it["id"] in seen:
+    for it in fetch_all_rss(RSS_FEEDS):
+        if not it.get("id"):
+            it["id"] = (it.get("link") or it.get("title"))[:300]
+        if it["id"] in seen:
+            continue
+        if matches_keywords(it):
+            # Same story already sent from another feed in an earlier run
+            it["story_keys"] = story_keys(it)
+            if any(seen.has_hash(k) for k in it["story_keys"]):
                 continue
-            if matches_keywords(it):
-                new_items.append(it)
+            it["published_ts"] = published_ts(it.get("published", ""))
+            new_items.append(it)
     
     # Fetch from yfinance
     for it in fetch_from_yfinance(TICKERS):
@@ -188,26 +597,51 @@ def main():
         if it["id"] in seen:
             continue
         if matches_keywords(it):
+            # Same story already sent from another feed in an earlier run
+            it["story_keys"] = story_keys(it)
+            if any(seen.has_hash(k) for k in it["story_keys"]):
+                continue
+            if "published_ts" not in it:
+                it["published_ts"] = published_ts(it.get("published", ""))
             new_items.append(it)
     
     # Sort items by publication time
-    new_items.sort(key=lambda x: parse_time_safe(x.get("published", "")), reverse=False)
+    # Stories older than the seen TTL may have expired from SeenDB; never treat them as new
+    if SEEN_TTL_DAYS > 0:
+        cutoff = int(time.time()) - SEEN_TTL_DAYS * 86400
+        new_items = [it for it in new_items if it["published_ts"] >= cutoff]
+    
+    new_items.sort(key=lambda x: x["published_ts"])
+    
+    # Same story from several feeds: keep one copy before translating/sending
+    new_items = dedup_items(new_items)
+    
+    # Translate everything we expect to send in one go
+    texts = []
+    for item in new_items[:MAX_PER_RUN]:
+        texts.append(item.get("title", ""))
+        texts.append(short_summary(item.get("summary", "")))
+    translated = dict(zip(texts, translate_batch(texts)))
     
-    # Send messages
+    # Send messages, one at a time so they arrive in publish order
     sent = 0
     for item in new_items:
         if sent >= MAX_PER_RUN:
             break
-        msg = build_msg(item)
+        msg = build_msg(item, translated)
         ok = send_telegram_message(msg)
         if ok:
             seen.add(item["id"])
+            for dupe_id in item.get("dupe_ids", []):
+                seen.add(dupe_id)
+            for key in set(item["story_keys"] + item.get("dupe_keys", [])):
+                seen.add_hash(key)
             sent += 1
             print("Sent:", item.get("title", "")[:80])
         else:
             print("Failed to send:", item.get("title", "")[:80])
     
-    save_seen(seen)
+    seen.close()
     print("Run complete. Sent:", sent)
 
 if __name__ == "__main__":